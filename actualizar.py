@@ -1,11 +1,20 @@
 #!/usr/bin/env python3
 # actualizar.py
+import functools
 import getpass
+import os
+import queue
 import sys
-from typing import Dict, List, Optional
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Callable, List, Optional, Sequence
 
 import pyodbc
 import pymysql
+from pymysql.converters import escape_string
 
 
 # =========================
@@ -51,6 +60,33 @@ def choose_columns_interactive(all_cols: List[str]) -> List[str]:
         sys.exit(1)
     return chosen
 
+def progress_printer(label: str, interval: float = 1.0):
+    """
+    Devuelve report(total, done=False) que reescribe en la misma línea el avance como
+    mucho una vez por `interval` segundos, para no frenar el bucle con E/S de consola.
+    """
+    last = [0.0]
+
+    def report(total: int, done: bool = False) -> None:
+        now = time.monotonic()
+        if done or now - last[0] >= interval:
+            last[0] = now
+            sys.stdout.write(f"\r  - {total} filas {label}..." + ("\n" if done else ""))
+            sys.stdout.flush()
+    return report
+
+
+# =========================
+# Identificadores
+# =========================
+def _qi_ms(name: str) -> str:
+    """Cita un identificador para SQL Server (equivale a QUOTENAME)."""
+    return "[" + name.replace("]", "]]") + "]"
+
+def _qi_my(name: str) -> str:
+    """Cita un identificador para MySQL."""
+    return "`" + name.replace("`", "``") + "`"
+
 
 # =========================
 # Conexiones
@@ -66,19 +102,31 @@ def connect_sqlserver(dsn: Optional[str], server: Optional[str], database: str,
     else:
         auth = f"UID={user};PWD={password};" if user else "Trusted_Connection=Yes;"
         conn_str = (
-            f"DRIVER={{{driver}}});SERVER={server};DATABASE={database};"
+            f"DRIVER={{{driver}}};SERVER={server};DATABASE={database};"
             f"{auth}Encrypt=No;TrustServerCertificate=Yes;"
         )
-        # Nota: hay una llave extra en DRIVER arriba, la corregimos:
-        conn_str = conn_str.replace("}})", "}};")
-    return pyodbc.connect(conn_str, autocommit=False)
+    # Solo se lee de SQL Server: autocommit evita abrir una transacción implícita
+    return pyodbc.connect(conn_str, autocommit=True)
+
+@functools.lru_cache(maxsize=None)
+def _bulk_cursor_class(max_stmt_length: int) -> type:
+    """Cursor pymysql cuyo executemany parte el INSERT multi-VALUES cada max_stmt_length bytes."""
+    return type("BulkCursor", (pymysql.cursors.Cursor,), {"max_stmt_length": max_stmt_length})
 
 def connect_mysql(host: str, port: int, database: Optional[str],
                   user: str, password: str, charset: str = "utf8mb4") -> pymysql.connections.Connection:
-    return pymysql.connect(
+    conn = pymysql.connect(
         host=host, port=port, user=user, password=password,
-        database=database, charset=charset, autocommit=False
+        database=database, charset=charset, autocommit=False,
+        local_infile=True,
     )
+    # pymysql parte el INSERT multi-VALUES en sentencias de max_stmt_length bytes
+    # (1 MB por defecto); los cursores de esta conexión lo ajustan a max_allowed_packet
+    # para que cada lote viaje en el menor número de sentencias posible.
+    with conn.cursor() as cur:
+        limit = int(fetch_max_allowed_packet(cur) * 0.8)
+    conn.cursorclass = _bulk_cursor_class(max(pymysql.cursors.Cursor.max_stmt_length, limit))
+    return conn
 
 
 # =========================
@@ -93,27 +141,16 @@ def fetch_tables_sqlserver(cur, schema: str) -> List[str]:
     """, (schema,))
     return [r[0] for r in cur.fetchall()]
 
-def fetch_columns_sqlserver(cur, schema: str, table: str):
-    cur.execute("""
+_SQL_COLUMNS = """
         SELECT c.COLUMN_NAME, c.DATA_TYPE, c.IS_NULLABLE,
                COLUMNPROPERTY(object_id(QUOTENAME(c.TABLE_SCHEMA)+'.'+QUOTENAME(c.TABLE_NAME)),
                               c.COLUMN_NAME,'IsIdentity') AS IS_IDENTITY
         FROM INFORMATION_SCHEMA.COLUMNS c
         WHERE c.TABLE_SCHEMA=? AND c.TABLE_NAME=?
         ORDER BY c.ORDINAL_POSITION
-    """, (schema, table))
-    rows = cur.fetchall()
-    return [
-        {
-            "name": x[0],
-            "type": x[1].lower(),
-            "nullable": (x[2].upper() == "YES"),
-            "is_identity": (x[3] == 1),
-        } for x in rows
-    ]
+"""
 
-def fetch_primary_key_sqlserver(cur, schema: str, table: str) -> List[str]:
-    cur.execute("""
+_SQL_PRIMARY_KEY = """
         SELECT kcu.COLUMN_NAME
         FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS tc
         JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE kcu
@@ -122,8 +159,28 @@ def fetch_primary_key_sqlserver(cur, schema: str, table: str) -> List[str]:
          AND tc.TABLE_NAME = kcu.TABLE_NAME
         WHERE tc.TABLE_SCHEMA=? AND tc.TABLE_NAME=? AND tc.CONSTRAINT_TYPE='PRIMARY KEY'
         ORDER BY kcu.ORDINAL_POSITION
-    """, (schema, table))
-    return [r[0] for r in cur.fetchall()]
+"""
+
+def _column_dicts(rows):
+    return [
+        {
+            "name": x[0],
+            "type": x[1].lower(),
+            "nullable": (x[2].upper() == "YES"),
+            "is_identity": (x[3] == 1),
+        } for x in rows
+    ]
+
+def fetch_table_metadata_sqlserver(cur, schema: str, table: str):
+    """
+    Columnas y PK de una tabla en un solo viaje al servidor (dos resultsets).
+    Devuelve (columnas, pk).
+    """
+    cur.execute(f"SET NOCOUNT ON; {_SQL_COLUMNS}; {_SQL_PRIMARY_KEY};",
+                (schema, table, schema, table))
+    cols = _column_dicts(cur.fetchall())
+    cur.nextset()
+    return cols, [r[0] for r in cur.fetchall()]
 
 def fetch_mysql_pk_columns(mysql_cur, db: str, table: str) -> List[str]:
     mysql_cur.execute("""
@@ -138,92 +195,423 @@ def fetch_mysql_pk_columns(mysql_cur, db: str, table: str) -> List[str]:
     """, (db, table))
     return [r[0] for r in mysql_cur.fetchall()]
 
+def fetch_max_allowed_packet(mysql_cur) -> int:
+    mysql_cur.execute("SELECT @@SESSION.max_allowed_packet")
+    return int(mysql_cur.fetchone()[0])
+
+
+# =========================
+# Carga masiva (LOAD DATA LOCAL INFILE)
+# =========================
+_TSV_ESCAPES = ((b"\\", b"\\\\"), (b"\t", b"\\t"), (b"\n", b"\\n"),
+                (b"\r", b"\\r"), (b"\x00", b"\\0"))
+
+def _tsv_value(v) -> bytes:
+    """Serializa un valor al formato por defecto de LOAD DATA (tabulado, NULL = \\N)."""
+    if v is None:
+        return b"\\N"
+    if isinstance(v, bool):
+        return b"1" if v else b"0"
+    raw = bytes(v) if isinstance(v, (bytes, bytearray)) else str(v).encode("utf-8")
+    for a, b in _TSV_ESCAPES:
+        if a in raw:
+            raw = raw.replace(a, b)
+    return raw
+
+def check_load_warnings(mysql_cur, table: str) -> None:
+    """
+    LOAD DATA LOCAL se comporta como IGNORE: duplicados, truncados y conversiones
+    fallidas solo dejan advertencias. Si las hay se aborta en vez de dar por buena
+    una carga con filas omitidas o valores alterados.
+    """
+    count = getattr(mysql_cur, "warning_count", None)
+    if count is None:
+        mysql_cur.execute("SELECT @@warning_count")
+        count = mysql_cur.fetchone()[0]
+    if count:
+        mysql_cur.execute("SHOW WARNINGS LIMIT 3")
+        detail = "; ".join(str(w[2]) for w in mysql_cur.fetchall())
+        raise RuntimeError(f"LOAD DATA en {table} generó {count} advertencias: {detail}")
+
+# ER_NOT_ALLOWED_COMMAND y ER_CLIENT_LOCAL_FILES_DISABLED: LOCAL INFILE deshabilitado
+_LOCAL_INFILE_REFUSED = (1148, 3948)
+
+def local_infile_refused(e: Exception) -> bool:
+    """Si el error de LOAD DATA significa que LOCAL INFILE no está permitido (y no otro fallo)."""
+    return bool(e.args) and e.args[0] in _LOCAL_INFILE_REFUSED
+
+def load_rows_infile(mysql_cur, table: str, cols: List[str], rows) -> None:
+    """
+    Vuelca las filas a un archivo temporal tabulado y lo carga con LOAD DATA LOCAL INFILE.
+    Se usa CHARACTER SET binary para que MySQL no reconvierta los bytes (texto va en UTF-8).
+    """
+    fd, path = tempfile.mkstemp(suffix=".tsv")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.writelines(b"\t".join(map(_tsv_value, r)) + b"\n" for r in rows)
+        mysql_cur.execute(
+            f"LOAD DATA LOCAL INFILE '{escape_string(path)}' INTO TABLE {_qi_my(table)} "
+            f"CHARACTER SET binary ({', '.join(map(_qi_my, cols))})"
+        )
+        check_load_warnings(mysql_cur, table)
+    finally:
+        os.remove(path)
+
+
+# =========================
+# Lectura en segundo plano
+# =========================
+def iter_batches(sql_cur, batch_size: int, prefetch: int = 4):
+    """
+    Genera lotes de fetchmany(batch_size) leídos por un hilo productor, de modo que
+    la lectura en SQL Server se solapa con la escritura en MySQL (pyodbc y pymysql
+    liberan el GIL durante la E/S). Como mucho quedan `prefetch` lotes en memoria.
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item) -> None:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def producer() -> None:
+        try:
+            while not stop.is_set():
+                rows = sql_cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                put(rows)
+        except BaseException as e:  # se relanza en el hilo consumidor
+            put(e)
+        put(None)
+
+    t = threading.Thread(target=producer, name="sqlserver-reader", daemon=True)
+    t.start()
+    try:
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        t.join()
+
+
+# =========================
+# Sesión de carga rápida
+# =========================
+FAST_LOAD_VARS = ("unique_checks", "foreign_key_checks", "sql_log_bin")
+
+@contextmanager
+def fast_load_session(mysql_cur):
+    """
+    Desactiva en la sesión MySQL las comprobaciones UNIQUE/FK y el binlog durante la
+    carga y restaura los valores previos al salir. Las variables que el usuario no
+    tenga permiso de cambiar (p. ej. sql_log_bin sin SUPER) se dejan como están.
+    """
+    previous = {}
+    for var in FAST_LOAD_VARS:
+        try:
+            mysql_cur.execute(f"SELECT @@SESSION.{var}")
+            value = mysql_cur.fetchone()[0]
+            mysql_cur.execute(f"SET SESSION {var}=0")
+            previous[var] = value
+        except pymysql.err.MySQLError as e:
+            print(f"[!] No se pudo desactivar {var}:", e)
+    try:
+        yield
+    finally:
+        for var, value in previous.items():
+            try:
+                mysql_cur.execute(f"SET SESSION {var}=%s", (value,))
+            except pymysql.err.MySQLError:
+                pass
+
+
+# =========================
+# Constructores de SQL (memoizados por tabla y columnas)
+# =========================
+@functools.lru_cache(maxsize=256)
+def _build_stage_sql(stg: str, cols: tuple):
+    """
+    Devuelve (columnas citadas, INSERT multi-VALUES a la tabla de staging). pymysql
+    no soporta sentencias preparadas del lado servidor (interpola en el cliente),
+    así que el texto se reutiliza entre lotes e invocaciones con las mismas columnas.
+    """
+    quoted_cols = ", ".join(map(_qi_my, cols))
+    placeholders = ", ".join(["%s"] * len(cols))
+    return quoted_cols, f"INSERT INTO {_qi_my(stg)} ({quoted_cols}) VALUES ({placeholders})"
+
+@functools.lru_cache(maxsize=256)
+def _build_update_sql(table: str, stg: str, upd_cols: tuple, pk_cols: tuple) -> str:
+    """
+    UPDATE por JOIN con la tabla de staging que solo toca filas con algún cambio.
+    """
+    on_pred = " AND ".join(f"t.{_qi_my(c)}=s.{_qi_my(c)}" for c in pk_cols)
+    set_clause = ", ".join(f"t.{_qi_my(c)}=s.{_qi_my(c)}" for c in upd_cols)
+    # Las filas idénticas se descartan en el servidor (<=> compara también NULLs):
+    # no generan bloqueo de escritura, undo ni evento en el binlog.
+    unchanged = " AND ".join(f"t.{_qi_my(c)}<=>s.{_qi_my(c)}" for c in upd_cols)
+    return (f"UPDATE {_qi_my(table)} t JOIN {_qi_my(stg)} s ON {on_pred} "
+            f"SET {set_clause} WHERE NOT ({unchanged})")
+
+@functools.lru_cache(maxsize=256)
+def _build_upsert_sql(table: str, stg: str, pk_cols: tuple, non_pk_upd: tuple) -> str:
+    """
+    INSERT ... SELECT desde staging con ON DUPLICATE KEY UPDATE de las columnas no PK;
+    sin columnas que actualizar se usa INSERT IGNORE.
+    """
+    quoted_cols = ", ".join(map(_qi_my, pk_cols + non_pk_upd))
+    update_set = ", ".join(f"{_qi_my(c)}=VALUES({_qi_my(c)})" for c in non_pk_upd)
+    if update_set:
+        return (f"INSERT INTO {_qi_my(table)} ({quoted_cols}) SELECT {quoted_cols} FROM {_qi_my(stg)} "
+                f"ON DUPLICATE KEY UPDATE {update_set}")
+    # Si no hay columnas para actualizar (caso raro), hacemos insert ignorando duplicados
+    return f"INSERT IGNORE INTO {_qi_my(table)} ({quoted_cols}) SELECT {quoted_cols} FROM {_qi_my(stg)}"
+
+
+# =========================
+# Tabla de staging
+# =========================
+def create_staging(mysql_cur, table: str, stg: str, cols: List[str]) -> str:
+    """
+    Crea la tabla temporal de staging con solo `cols` (sin claves ni restricciones) y
+    devuelve el INSERT multi-VALUES para cargarla cuando no hay LOAD DATA.
+    """
+    quoted_cols, insert_sql = _build_stage_sql(stg, tuple(cols))
+    mysql_cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {_qi_my(stg)}")
+    mysql_cur.execute(f"CREATE TEMPORARY TABLE {_qi_my(stg)} SELECT {quoted_cols} FROM {_qi_my(table)} LIMIT 0")
+    return insert_sql
+
+def stage_rows(mysql_cur, stg: str, cols: List[str], insert_sql: str, rows, use_infile: bool) -> bool:
+    """
+    Carga un lote en la tabla de staging por LOAD DATA LOCAL INFILE o, si no está
+    disponible, por INSERT multi-VALUES. Devuelve si LOAD DATA sigue en uso.
+    """
+    if use_infile:
+        try:
+            load_rows_infile(mysql_cur, stg, cols, rows)
+            return True
+        except pymysql.err.MySQLError as e:
+            if not local_infile_refused(e):
+                raise
+            # local_infile deshabilitado: seguimos con INSERT por lotes
+            print("[!] LOAD DATA LOCAL INFILE no disponible, se usa INSERT por lotes:", e)
+    # executemany acepta cualquier iterable: no se materializa una lista intermedia
+    mysql_cur.executemany(insert_sql, (tuple(r) for r in rows))
+    return False
+
 
 # =========================
 # Lógica de actualización
 # =========================
 def update_only(sql_cur, mysql_conn, mysql_cur, schema: str, table: str,
                 pk_cols: List[str], upd_cols: List[str], batch_size: int = 10_000,
-                where_clause: Optional[str] = None):
+                where_clause: Optional[str] = None, commit_every: int = 0,
+                order_by: bool = False):
+    """
+    UPDATE-only: actualiza columnas seleccionadas de filas existentes (por PK).
+    Cada lote se carga en una tabla de staging y se aplica con un único UPDATE ... JOIN.
+    Se hace un único COMMIT al final; si commit_every > 0, se confirma además
+    cada vez que se acumulan al menos esa cantidad de filas.
+    Con order_by=True las filas se leen ordenadas por PK.
+    """
     if not pk_cols:
         print("[!] No hay clave primaria. UPDATE-only requiere columnas clave para el WHERE.")
         sys.exit(1)
 
-    # No permitimos actualizar columnas PK
-    upd_cols = [c for c in upd_cols if c not in pk_cols]
+    # No permitimos actualizar columnas PK (SQL Server compara nombres sin distinguir mayúsculas)
+    pk_set = {c.lower() for c in pk_cols}
+    upd_cols = [c for c in upd_cols if c.lower() not in pk_set]
     if not upd_cols:
         print("[!] No hay columnas para actualizar (todas eran PK).")
         return
 
-    select_cols = ", ".join(f"[{c}]" for c in (pk_cols + upd_cols))
+    stage_cols = pk_cols + upd_cols
+    select_cols = ", ".join(map(_qi_ms, stage_cols))
     where_sql = f" WHERE {where_clause} " if where_clause else ""
-    order_by = f" ORDER BY {', '.join('['+c+']' for c in pk_cols)}"
-    sql_cur.execute(f"SELECT {select_cols} FROM [{schema}].[{table}]{where_sql}{order_by};")
-
-    set_clause = ", ".join(f"`{c}`=%s" for c in upd_cols)
-    where_pred = " AND ".join(f"`{c}`=%s" for c in pk_cols)
-    upd_sql = f"UPDATE `{table}` SET {set_clause} WHERE {where_pred}"
+    # El orden por PK solo sirve para reanudar de forma determinista; sin él
+    # SQL Server puede ir devolviendo filas sin esperar a un SORT.
+    order_sql = f" ORDER BY {', '.join(map(_qi_ms, pk_cols))}" if order_by else ""
+    sql_cur.arraysize = batch_size
+    sql_cur.execute(f"SELECT {select_cols} FROM {_qi_ms(schema)}.{_qi_ms(table)}{where_sql}{order_sql};")
+
+    stg = f"_stg_{table}"
+    insert_sql = create_staging(mysql_cur, table, stg, stage_cols)
+    upd_sql = _build_update_sql(table, stg, tuple(upd_cols), tuple(pk_cols))
+    clear_sql = f"DELETE FROM {_qi_my(stg)}"
+    use_infile = True
 
     total = 0
-    while True:
-        rows = sql_cur.fetchmany(batch_size)
-        if not rows:
-            break
-        # Reordena: [upd_vals..., pk_vals...]
-        data = []
-        for r in rows:
-            # r = (pk1, pk2, ..., col1, col2, ...)
-            pk_vals = tuple(r[:len(pk_cols)])
-            col_vals = tuple(r[len(pk_cols):])
-            data.append(tuple(list(col_vals) + list(pk_vals)))
-        mysql_cur.executemany(upd_sql, data)
+    pending = 0  # filas escritas desde el último COMMIT
+    report = progress_printer("procesadas")
+    try:
+        for rows in iter_batches(sql_cur, batch_size):
+            use_infile = stage_rows(mysql_cur, stg, stage_cols, insert_sql, rows, use_infile)
+            mysql_cur.execute(upd_sql)
+            mysql_cur.execute(clear_sql)
+            total += len(rows)
+            pending += len(rows)
+            if commit_every and pending >= commit_every:
+                mysql_conn.commit()
+                pending = 0
+            report(total)
+        report(total, done=True)
         mysql_conn.commit()
-        total += len(data)
-        print(f"  - {total} filas procesadas...")
+    finally:
+        mysql_cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {_qi_my(stg)}")
     print(f"[✓] UPDATE completado. Filas consideradas: {total}.")
 
 def upsert_mode(sql_cur, mysql_conn, mysql_cur, schema: str, table: str,
                 pk_cols: List[str], upd_cols: List[str], batch_size: int = 10_000,
-                where_clause: Optional[str] = None):
+                where_clause: Optional[str] = None, commit_every: int = 0,
+                order_by: bool = False, where_params: Sequence = (),
+                on_batch: Optional[Callable[[int], None]] = None):
     """
     UPSERT: Inserta si no existe (por PK) y actualiza columnas seleccionadas si existe.
     Requiere que la tabla MySQL tenga PRIMARY KEY/UNIQUE en pk_cols.
+    Cada lote se carga en una tabla de staging y se fusiona con un único INSERT ... SELECT.
+    Se hace un único COMMIT al final (o cada commit_every filas si es > 0).
+    Con order_by=True las filas se leen ordenadas por PK. where_params son los
+    parámetros (?) que use where_clause. Con on_batch (upsert_parallel) no se imprime
+    avance propio: se notifica cuántas filas trae cada lote y el llamador lo agrega.
     """
     if not pk_cols:
         print("[!] No hay clave primaria. UPSERT requiere columnas clave.")
         sys.exit(1)
 
     # En upsert, enviamos PK + columnas a actualizar (sin duplicar PK en update list)
-    non_pk_upd = [c for c in upd_cols if c not in pk_cols]
+    pk_set = {c.lower() for c in pk_cols}
+    non_pk_upd = [c for c in upd_cols if c.lower() not in pk_set]
     insert_cols = pk_cols + non_pk_upd
 
     if not insert_cols:
         print("[!] No hay columnas para insertar/actualizar.")
         return
 
-    select_cols = ", ".join(f"[{c}]" for c in insert_cols)
+    select_cols = ", ".join(map(_qi_ms, insert_cols))
     where_sql = f" WHERE {where_clause} " if where_clause else ""
-    order_by = f" ORDER BY {', '.join('['+c+']' for c in pk_cols)}"
-    sql_cur.execute(f"SELECT {select_cols} FROM [{schema}].[{table}]{where_sql}{order_by};")
-
-    placeholders = ", ".join(["%s"] * len(insert_cols))
-    update_set = ", ".join(f"`{c}`=VALUES(`{c}`)" for c in non_pk_upd) or ""
-    if update_set:
-        sql = f"INSERT INTO `{table}` ({', '.join(f'`{c}`' for c in insert_cols)}) VALUES ({placeholders}) ON DUPLICATE KEY UPDATE {update_set}"
-    else:
-        # Si no hay columnas para actualizar (caso raro), hacemos insert ignorando duplicados
-        sql = f"INSERT IGNORE INTO `{table}` ({', '.join(f'`{c}`' for c in insert_cols)}) VALUES ({placeholders})"
+    # El orden por PK solo sirve para reanudar de forma determinista; sin él
+    # SQL Server puede ir devolviendo filas sin esperar a un SORT.
+    order_sql = f" ORDER BY {', '.join(map(_qi_ms, pk_cols))}" if order_by else ""
+    sql_cur.arraysize = batch_size
+    sql_cur.execute(f"SELECT {select_cols} FROM {_qi_ms(schema)}.{_qi_ms(table)}{where_sql}{order_sql};", *where_params)
+
+    stg = f"_stg_{table}"
+    insert_sql = create_staging(mysql_cur, table, stg, insert_cols)
+    merge_sql = _build_upsert_sql(table, stg, tuple(pk_cols), tuple(non_pk_upd))
+    clear_sql = f"DELETE FROM {_qi_my(stg)}"
+    use_infile = True
 
     total = 0
-    while True:
-        rows = sql_cur.fetchmany(batch_size)
-        if not rows:
-            break
-        data = [tuple(row) for row in rows]
-        mysql_cur.executemany(sql, data)
+    pending = 0  # filas escritas desde el último COMMIT
+    report = progress_printer("procesadas") if on_batch is None else None
+    try:
+        for rows in iter_batches(sql_cur, batch_size):
+            use_infile = stage_rows(mysql_cur, stg, insert_cols, insert_sql, rows, use_infile)
+            mysql_cur.execute(merge_sql)
+            mysql_cur.execute(clear_sql)
+            total += len(rows)
+            pending += len(rows)
+            if commit_every and pending >= commit_every:
+                mysql_conn.commit()
+                pending = 0
+            if report:
+                report(total)
+            else:
+                on_batch(len(rows))
+        if report:
+            report(total, done=True)
         mysql_conn.commit()
-        total += len(data)
-        print(f"  - {total} filas procesadas...")
+    finally:
+        mysql_cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {_qi_my(stg)}")
+    if report:
+        print(f"[✓] UPSERT completado. Filas consideradas: {total}.")
+
+
+def fetch_pk_boundaries(sql_cur, schema: str, table: str, pk_col: str, parts: int,
+                        where_clause: Optional[str] = None) -> list:
+    """
+    Reparte la tabla en `parts` tramos de tamaño similar con NTILE sobre pk_col y
+    devuelve el valor máximo de cada tramo salvo el último (límites de corte).
+    """
+    where_sql = f" WHERE {where_clause} " if where_clause else ""
+    sql_cur.execute(f"""
+        SELECT MAX(k) FROM (
+            SELECT {_qi_ms(pk_col)} AS k, NTILE(?) OVER (ORDER BY {_qi_ms(pk_col)}) AS tile
+            FROM {_qi_ms(schema)}.{_qi_ms(table)}{where_sql}
+        ) x
+        GROUP BY tile
+        ORDER BY MAX(k)
+    """, parts)
+    bounds = [r[0] for r in sql_cur.fetchall()][:-1]
+    return list(dict.fromkeys(bounds))
+
+def upsert_parallel(connect_sql: Callable, connect_my: Callable, schema: str, table: str,
+                    pk_cols: List[str], upd_cols: List[str], workers: int,
+                    batch_size: int = 10_000, where_clause: Optional[str] = None,
+                    commit_every: int = 0, fast_load: bool = False):
+    """
+    UPSERT repartido en `workers` hilos por rangos de la primera columna PK. Cada hilo
+    abre sus propias conexiones (connect_sql/connect_my) y confirma su propio tramo,
+    por lo que un fallo en un hilo no deshace lo ya confirmado por los demás.
+    """
+    sql_cnx = connect_sql()
+    try:
+        bounds = fetch_pk_boundaries(sql_cnx.cursor(), schema, table, pk_cols[0], workers, where_clause)
+    finally:
+        sql_cnx.close()
+    edges = [None] + bounds + [None]
+    pk = _qi_ms(pk_cols[0])
+
+    # Un único contador y línea de avance para todos los tramos
+    lock = threading.Lock()
+    report = progress_printer("procesadas")
+    total = 0
+
+    def on_batch(n: int) -> None:
+        nonlocal total
+        with lock:
+            total += n
+            report(total)
+
+    def run(lo, hi) -> None:
+        preds, params = [], []
+        if lo is not None:
+            preds.append(f"{pk} > ?")
+            params.append(lo)
+        if hi is not None:
+            preds.append(f"{pk} <= ?")
+            params.append(hi)
+        if where_clause:
+            preds.insert(0, f"({where_clause})")
+        s_cnx, m_cnx = connect_sql(), connect_my()
+        try:
+            s_cur, m_cur = s_cnx.cursor(), m_cnx.cursor()
+            with (fast_load_session(m_cur) if fast_load else nullcontext()):
+                upsert_mode(s_cur, m_cnx, m_cur, schema, table, pk_cols, upd_cols,
+                            batch_size=batch_size, where_clause=" AND ".join(preds) or None,
+                            commit_every=commit_every, where_params=params, on_batch=on_batch)
+        except BaseException:
+            m_cnx.rollback()
+            raise
+        finally:
+            s_cnx.close()
+            m_cnx.close()
+
+    print(f"[+] UPSERT en {len(edges) - 1} hilos por rangos de {pk_cols[0]}...")
+    with ThreadPoolExecutor(max_workers=len(edges) - 1) as ex:
+        futures = [ex.submit(run, lo, hi) for lo, hi in zip(edges, edges[1:])]
+        for f in futures:
+            f.result()
+    report(total, done=True)
     print(f"[✓] UPSERT completado. Filas consideradas: {total}.")
 
 
@@ -287,8 +675,7 @@ def main():
         sys.exit(1)
 
     # Columnas
-    meta = fetch_columns_sqlserver(sql_cur, schema, src_table)
-    pk_sql = fetch_primary_key_sqlserver(sql_cur, schema, src_table)
+    meta, pk_sql = fetch_table_metadata_sqlserver(sql_cur, schema, src_table)
 
     # Evitar proponer rowversion/timestamp o columnas identidad para UPDATE
     safe_cols = []
@@ -315,9 +702,18 @@ def main():
         if not pk_mysql:
             print("[!] La tabla destino en MySQL no tiene PRIMARY KEY. UPSERT requiere PK/UNIQUE. Cancela o crea una PK y vuelve a intentar.")
             sys.exit(1)
-        if pk_sql and (set(map(str.lower, pk_sql)) - set(map(str.lower, pk_mysql))):
+        pk_mysql_set = {c.lower() for c in pk_mysql}
+        if any(c.lower() not in pk_mysql_set for c in pk_sql):
             print("[!] Aviso: las columnas PK en SQL Server no coinciden con la PK de MySQL. Aun así intentaremos, pero el UPSERT depende de la PK en MySQL.")
 
+    # Paralelismo (solo UPSERT): tramos de la PK procesados en hilos con conexiones propias
+    workers = 1
+    if mode.startswith("UPSERT"):
+        workers = max(1, int(ask("Hilos en paralelo para el UPSERT", "1")))
+
+    # Carga rápida (opcional): sin UNIQUE/FK checks ni binlog durante la carga
+    fast_load = confirm("¿Activar carga rápida (desactiva unique_checks, foreign_key_checks y binlog en la sesión)?", False)
+
     # Confirmación
     print("\nResumen:")
     print(f"  Origen:    SQL Server {sql_db}.{schema}.{src_table}")
@@ -327,29 +723,40 @@ def main():
     print(f"  PK MySQL:  {pk_mysql or 'N/A'}")
     print(f"  Columnas a actualizar: {', '.join(upd_cols)}")
     print(f"  Filtro WHERE: {where_clause or '(ninguno)'}")
+    print(f"  Carga rápida: {'sí' if fast_load else 'no'}")
+    if mode.startswith("UPSERT"):
+        print(f"  Hilos:     {workers}")
     if not confirm("¿Continuar?", True):
         print("Cancelado por el usuario.")
         sys.exit(0)
 
     try:
-        if mode.startswith("UPDATE"):
-            if not pk_sql:
-                print("[!] UPDATE requiere PK para armar el WHERE. Cancelo.")
-                sys.exit(1)
-            update_only(sql_cur, mysql_cnx, mysql_cur, schema, src_table, pk_sql, upd_cols,
-                        batch_size=10_000, where_clause=where_clause or None)
-        else:
-            # UPSERT
-            if not pk_mysql:
-                print("[!] UPSERT requiere PK/UNIQUE en MySQL. Cancelo.")
-                sys.exit(1)
-            # Si no hay PK en SQL Server, igual se puede si sabemos qué columnas son PK en MySQL,
-            # pero entonces necesitamos traer esas columnas desde SQL Server también.
-            pk_for_upsert = pk_sql if pk_sql else pk_mysql
-            # Asegura que las PK estén incluidas en la extracción:
-            need_cols = list(dict.fromkeys(pk_for_upsert + upd_cols))
-            upsert_mode(sql_cur, mysql_cnx, mysql_cur, schema, src_table,
-                        pk_for_upsert, need_cols, batch_size=10_000, where_clause=where_clause or None)
+        with (fast_load_session(mysql_cur) if fast_load else nullcontext()):
+            if mode.startswith("UPDATE"):
+                if not pk_sql:
+                    print("[!] UPDATE requiere PK para armar el WHERE. Cancelo.")
+                    sys.exit(1)
+                update_only(sql_cur, mysql_cnx, mysql_cur, schema, src_table, pk_sql, upd_cols,
+                            batch_size=10_000, where_clause=where_clause or None)
+            else:
+                # UPSERT
+                if not pk_mysql:
+                    print("[!] UPSERT requiere PK/UNIQUE en MySQL. Cancelo.")
+                    sys.exit(1)
+                # Si no hay PK en SQL Server, igual se puede si sabemos qué columnas son PK en MySQL,
+                # pero entonces necesitamos traer esas columnas desde SQL Server también.
+                pk_for_upsert = pk_sql if pk_sql else pk_mysql
+                # Asegura que las PK estén incluidas en la extracción:
+                need_cols = list(dict.fromkeys(pk_for_upsert + upd_cols))
+                if workers > 1:
+                    upsert_parallel(
+                        lambda: connect_sqlserver(dsn, server, sql_db, sql_user or None, sql_pass, driver),
+                        lambda: connect_mysql(mysql_host, mysql_port, mysql_db, mysql_user, mysql_pass),
+                        schema, src_table, pk_for_upsert, need_cols, workers,
+                        batch_size=10_000, where_clause=where_clause or None, fast_load=fast_load)
+                else:
+                    upsert_mode(sql_cur, mysql_cnx, mysql_cur, schema, src_table,
+                                pk_for_upsert, need_cols, batch_size=10_000, where_clause=where_clause or None)
 
         print("\n[🎉] Proceso finalizado.")
     except KeyboardInterrupt:
@@ -1,10 +1,22 @@
 #!/usr/bin/env python3
+import functools
 import getpass
+import os
+import queue
+import re
 import sys
-from typing import Dict, List, Optional
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
 
 import pyodbc
 import pymysql
+from pymysql.constants import SERVER_STATUS
+from pymysql.converters import escape_item, escape_string
 
 
 # ---------------------------
@@ -34,6 +46,30 @@ def choose(prompt: str, options: List[str]) -> str:
             return options[int(sel) - 1]
         print("Opción inválida.")
 
+_print_lock = threading.Lock()
+
+def log(*args) -> None:
+    """print() serializado entre hilos (migración de tablas en paralelo)."""
+    with _print_lock:
+        print(*args)
+
+def progress_printer(label: str, interval: float = 5.0) -> Callable[[int], None]:
+    """
+    Devuelve report(total) que informa el avance como mucho una vez cada `interval`
+    segundos, en vez de una línea por lote. Si la salida no es una terminal (pipe, CI)
+    no hay avance intermedio: el total final ya lo registra copy_table.
+    """
+    if not sys.stdout.isatty():
+        return lambda total: None
+    last = [time.monotonic()]
+
+    def report(total: int) -> None:
+        now = time.monotonic()
+        if now - last[0] >= interval:
+            last[0] = now
+            log(f"    - {label}: {total} filas migradas...")
+    return report
+
 def choose_columns_interactive(all_cols: List[str]) -> List[str]:
     print("\nColumnas disponibles:")
     for i, c in enumerate(all_cols, 1):
@@ -45,7 +81,8 @@ def choose_columns_interactive(all_cols: List[str]) -> List[str]:
         return all_cols
     chosen = [c.strip() for c in sel.split(",") if c.strip()]
     # validar
-    missing = [c for c in chosen if c not in all_cols]
+    all_set = set(all_cols)
+    missing = [c for c in chosen if c not in all_set]
     if missing:
         print("Columnas no encontradas:", ", ".join(missing))
         sys.exit(1)
@@ -74,15 +111,50 @@ def connect_sqlserver(dsn: Optional[str], server: Optional[str], database: str,
             f"DRIVER={{{driver}}};SERVER={server};DATABASE={database};"
             f"{auth}Encrypt=No;TrustServerCertificate=Yes;"
         )
+    # Paquetes TDS de 32 KB (máximo): menos viajes de red al leer lotes grandes
+    conn_str += "Packet Size=32767;"
     return pyodbc.connect(conn_str, autocommit=False)
 
 
+# Ajustes de sesión para migraciones largas, aplicados una vez al conectar: esperas de
+# bloqueo y de red holgadas para que un lote grande o una pausa no corten la conexión.
+# unique_checks/foreign_key_checks no van aquí: los gestiona bulk_load_session por tabla.
+_MYSQL_SESSION_INIT = ("SET SESSION innodb_lock_wait_timeout=300, net_read_timeout=600, "
+                       "net_write_timeout=600, wait_timeout=28800")
+
 def connect_mysql(host: str, port: int, database: Optional[str],
                   user: str, password: str, charset: str = "utf8mb4") -> pymysql.connections.Connection:
+    # PyMySQL ya activa SO_KEEPALIVE en el socket TCP. Sin read_timeout en el cliente:
+    # un CREATE INDEX sobre una tabla grande puede tardar mucho más que cualquier límite fijo.
     return pymysql.connect(
         host=host, port=port, user=user, password=password,
-        database=database, charset=charset, autocommit=False
+        database=database, charset=charset, autocommit=False,
+        local_infile=True, init_command=_MYSQL_SESSION_INIT,
+        write_timeout=600,
+    )
+
+
+def connect_mysql_odbc(driver: str, host: str, port: int, database: Optional[str],
+                       user: str, password: str) -> pyodbc.Connection:
+    """
+    Destino MySQL a través de ODBC (p. ej. "MySQL ODBC 8.0 Unicode Driver"), para entornos
+    donde solo hay ODBC. copy_table detecta el cursor pyodbc y escribe con executemany y
+    fast_executemany (todo el lote en un solo envío de parámetros) en vez de LOAD DATA.
+    Contrapartida: el driver MySQL describe los parámetros como VARCHAR(255) y pyodbc
+    dimensiona los búferes con eso, así que textos más largos pueden truncarse o fallar;
+    en tablas con columnas de texto anchas conviene usar PyMySQL.
+    """
+    conn_str = (
+        f"DRIVER={{{driver}}};SERVER={host};PORT={port};UID={user};PWD={password};"
+        f"CHARSET=utf8mb4;INITSTMT={_MYSQL_SESSION_INIT};"
     )
+    if database:
+        conn_str += f"DATABASE={database};"
+    return pyodbc.connect(conn_str, autocommit=False)
+
+
+# Errores de cualquiera de los dos clientes de destino (PyMySQL u ODBC)
+DB_ERRORS = (pymysql.err.MySQLError, pyodbc.Error)
 
 
 # ---------------------------
@@ -127,52 +199,147 @@ TYPE_MAP = {
     "sql_variant": "JSON",  # aproximación
 }
 
+# Consultas de metadatos por tabla: se lanzan con sp_executesql y texto idéntico en cada
+# llamada, así SQL Server reutiliza el plan en caché en lugar de compilar una vez por tabla.
+_ID_PARAMS = "@s nvarchar(128), @t nvarchar(128)"
+
+def exec_sp(cur, stmt: str, params_decl: str, *params):
+    """Ejecuta `stmt` (con parámetros @nombre) vía sp_executesql."""
+    markers = "".join(", ?" for _ in params)
+    cur.execute(f"EXEC sp_executesql ?, ?{markers}", (stmt, params_decl, *params))
+
+# Los lectores de metadatos recorren el cursor directamente (sin fetchall): las filas
+# llegan de pyodbc en streaming y solo se conserva el resultado ya transformado.
+
 def fetch_tables_sqlserver(cur, schema: str) -> List[str]:
-    cur.execute("""
+    exec_sp(cur, """
         SELECT TABLE_NAME
         FROM INFORMATION_SCHEMA.TABLES
-        WHERE TABLE_TYPE='BASE TABLE' AND TABLE_SCHEMA=?
+        WHERE TABLE_TYPE='BASE TABLE' AND TABLE_SCHEMA=@s
         ORDER BY TABLE_NAME
-    """, (schema,))
-    return [r[0] for r in cur.fetchall()]
+    """, "@s nvarchar(128)", schema)
+    return [r[0] for r in cur]
 
 def fetch_columns_sqlserver(cur, schema: str, table: str):
-    cur.execute("""
+    exec_sp(cur, """
         SELECT c.COLUMN_NAME, c.DATA_TYPE, c.CHARACTER_MAXIMUM_LENGTH,
                c.NUMERIC_PRECISION, c.NUMERIC_SCALE, c.IS_NULLABLE,
                COLUMNPROPERTY(object_id(QUOTENAME(c.TABLE_SCHEMA)+'.'+QUOTENAME(c.TABLE_NAME)),
                               c.COLUMN_NAME,'IsIdentity') AS IS_IDENTITY,
                c.COLUMN_DEFAULT
         FROM INFORMATION_SCHEMA.COLUMNS c
-        WHERE c.TABLE_SCHEMA=? AND c.TABLE_NAME=?
+        WHERE c.TABLE_SCHEMA=@s AND c.TABLE_NAME=@t
         ORDER BY c.ORDINAL_POSITION
-    """, (schema, table))
-    cols = cur.fetchall()
-    return [
-        {
-            "name": x[0],
-            "type": x[1].lower(),
-            "char_len": x[2],
-            "num_prec": x[3],
-            "num_scale": x[4],
-            "nullable": (x[5].upper() == "YES"),
-            "is_identity": (x[6] == 1),
-            "default": x[7],
-        } for x in cols
-    ]
+    """, _ID_PARAMS, schema, table)
+    return [_column_dict(x) for x in cur]
 
-def fetch_primary_key_sqlserver(cur, schema: str, table: str) -> List[str]:
+def _column_dict(x) -> Dict:
+    return {
+        "name": x[0],
+        "type": x[1].lower(),
+        "char_len": x[2],
+        "num_prec": x[3],
+        "num_scale": x[4],
+        "nullable": (x[5].upper() == "YES"),
+        "is_identity": (x[6] == 1),
+        "default": x[7],
+    }
+
+def fetch_all_columns_sqlserver(cur, schema: str) -> Dict[str, List[Dict]]:
+    """Columnas de todas las tablas del esquema en una sola consulta, agrupadas por tabla."""
     cur.execute("""
+        SELECT c.COLUMN_NAME, c.DATA_TYPE, c.CHARACTER_MAXIMUM_LENGTH,
+               c.NUMERIC_PRECISION, c.NUMERIC_SCALE, c.IS_NULLABLE,
+               COLUMNPROPERTY(object_id(QUOTENAME(c.TABLE_SCHEMA)+'.'+QUOTENAME(c.TABLE_NAME)),
+                              c.COLUMN_NAME,'IsIdentity') AS IS_IDENTITY,
+               c.COLUMN_DEFAULT, c.TABLE_NAME
+        FROM INFORMATION_SCHEMA.COLUMNS c
+        WHERE c.TABLE_SCHEMA=?
+        ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+    """, (schema,))
+    by_table: Dict[str, List[Dict]] = {}
+    for x in cur:
+        by_table.setdefault(x[8], []).append(_column_dict(x))
+    return by_table
+
+def fetch_primary_key_sqlserver(cur, schema: str, table: str) -> List[str]:
+    exec_sp(cur, """
         SELECT kcu.COLUMN_NAME
         FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS tc
         JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE kcu
           ON tc.CONSTRAINT_NAME = kcu.CONSTRAINT_NAME
          AND tc.TABLE_SCHEMA = kcu.TABLE_SCHEMA
          AND tc.TABLE_NAME = kcu.TABLE_NAME
-        WHERE tc.TABLE_SCHEMA=? AND tc.TABLE_NAME=? AND tc.CONSTRAINT_TYPE='PRIMARY KEY'
+        WHERE tc.TABLE_SCHEMA=@s AND tc.TABLE_NAME=@t AND tc.CONSTRAINT_TYPE='PRIMARY KEY'
         ORDER BY kcu.ORDINAL_POSITION
-    """, (schema, table))
-    return [r[0] for r in cur.fetchall()]
+    """, _ID_PARAMS, schema, table)
+    return [r[0] for r in cur]
+
+def fetch_all_pks_sqlserver(cur, schema: str) -> Dict[str, List[str]]:
+    """Columnas PK de todas las tablas del esquema en una sola consulta."""
+    cur.execute("""
+        SELECT kcu.TABLE_NAME, kcu.COLUMN_NAME
+        FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS tc
+        JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE kcu
+          ON tc.CONSTRAINT_NAME = kcu.CONSTRAINT_NAME
+         AND tc.TABLE_SCHEMA = kcu.TABLE_SCHEMA
+         AND tc.TABLE_NAME = kcu.TABLE_NAME
+        WHERE tc.TABLE_SCHEMA=? AND tc.CONSTRAINT_TYPE='PRIMARY KEY'
+        ORDER BY kcu.TABLE_NAME, kcu.ORDINAL_POSITION
+    """, (schema,))
+    by_table: Dict[str, List[str]] = {}
+    for t, c in cur:
+        by_table.setdefault(t, []).append(c)
+    return by_table
+
+def fetch_indexes_sqlserver(cur, schema: str, table: Optional[str] = None) -> Dict[str, List[Dict]]:
+    """
+    Índices secundarios (no PK) del esquema, o solo de `table`, agrupados por tabla.
+    Se omiten los índices filtrados (WHERE ...), que MySQL no admite. Cada índice: {"name", "unique", "columns"} con las columnas clave en orden.
+    """
+    table_filter = " AND t.name = @t" if table else ""
+    exec_sp(cur, f"""
+        SELECT t.name, i.name, i.is_unique, c.name
+        FROM sys.indexes i
+        JOIN sys.tables t ON t.object_id = i.object_id
+        JOIN sys.schemas s ON s.schema_id = t.schema_id
+        JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+        JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+        WHERE s.name = @s AND i.is_primary_key = 0 AND i.is_hypothetical = 0 AND i.is_disabled = 0
+          AND i.has_filter = 0
+          AND i.type IN (1, 2) AND ic.is_included_column = 0 AND ic.key_ordinal > 0{table_filter}
+        ORDER BY t.name, i.name, ic.key_ordinal
+    """, _ID_PARAMS, schema, table)
+    by_table: Dict[str, Dict[str, Dict]] = {}
+    for t, name, unique, col in cur:
+        idx = by_table.setdefault(t, {}).setdefault(name, {"name": name, "unique": bool(unique), "columns": []})
+        idx["columns"].append(col)
+    return {t: list(idxs.values()) for t, idxs in by_table.items()}
+
+def fetch_row_counts_sqlserver(cur, schema: str, table: Optional[str] = None) -> Dict[str, int]:
+    """
+    Filas por tabla según sys.dm_db_partition_stats (metadatos, sin recorrer la tabla).
+    El conteo es aproximado: un 0 debe confirmarse con source_is_empty antes de omitir
+    la copia. Requiere VIEW DATABASE STATE; sin ese permiso devuelve {} y se copia sin atajo.
+    """
+    table_filter = " AND t.name = @t" if table else ""
+    try:
+        exec_sp(cur, f"""
+            SELECT t.name, SUM(ps.row_count)
+            FROM sys.dm_db_partition_stats ps
+            JOIN sys.tables t ON t.object_id = ps.object_id
+            JOIN sys.schemas s ON s.schema_id = t.schema_id
+            WHERE s.name = @s AND ps.index_id IN (0, 1){table_filter}
+            GROUP BY t.name
+        """, _ID_PARAMS, schema, table)
+        return {t: int(n or 0) for t, n in cur}
+    except pyodbc.Error:
+        return {}
+
+def source_is_empty(cur, schema: str, table: str) -> bool:
+    """Comprobación exacta (una sola búsqueda) de que la tabla origen no tiene filas."""
+    cur.execute(f"SELECT TOP (1) 1 FROM [{schema}].[{table}];")
+    return cur.fetchone() is None
 
 def sqlserver_to_mysql_type(col: Dict) -> str:
     t = col["type"]
@@ -186,7 +353,51 @@ def sqlserver_to_mysql_type(col: Dict) -> str:
         return f"DECIMAL({p},{s})"
     return mapped
 
-def build_create_table_mysql(table: str, columns: List[Dict], pk_cols: List[str]) -> str:
+def _index_part(col: Dict) -> Optional[Tuple[str, bool]]:
+    """
+    (columna de índice MySQL, usa prefijo). TEXT/BLOB y VARCHAR largos necesitan prefijo;
+    JSON no se indexa (None).
+    """
+    mapped = sqlserver_to_mysql_type(col)
+    if mapped == "JSON":
+        return None
+    if mapped in ("LONGTEXT", "LONGBLOB", "TEXT"):
+        return f"`{col['name']}`(191)", True
+    if mapped.startswith(("VARCHAR(", "VARBINARY(")) and col["char_len"] and col["char_len"] > 768:
+        # 768 caracteres utf8mb4 = 3072 bytes, el máximo de una clave InnoDB
+        return f"`{col['name']}`(768)", True
+    return f"`{col['name']}`", False
+
+# DEFAULT de SQL Server -> MySQL: regex compiladas una vez y probadas en orden
+_DEFAULT_PARENS = re.compile(r"^\(*(.*?)\)*$", re.S)
+_DEFAULT_FNS = (
+    (re.compile(r"^(getdate|sysdatetime|current_timestamp)\(?\)?$", re.I), " DEFAULT CURRENT_TIMESTAMP"),
+    (re.compile(r"^newid\(?\)?$", re.I), ""),
+)
+_DEFAULT_NUMBER = re.compile(r"^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$")
+_DEFAULT_STRING = re.compile(r"^N?'(.*)'$", re.S)
+_SQL_STR_ESCAPE = str.maketrans({"\\": "\\\\", "'": "\\'"})
+
+def default_clause_mysql(default) -> str:
+    """Cláusula ` DEFAULT ...` para un COLUMN_DEFAULT de SQL Server (p. ej. "((0))", "(N'x')")."""
+    d = _DEFAULT_PARENS.match(str(default).strip()).group(1)
+    for rx, clause in _DEFAULT_FNS:
+        if rx.match(d):
+            return clause
+    if _DEFAULT_NUMBER.match(d):
+        return f" DEFAULT {d}"
+    m = _DEFAULT_STRING.match(d)
+    text = m.group(1).replace("''", "'") if m else d
+    return f" DEFAULT '{text.translate(_SQL_STR_ESCAPE)}'"
+
+def build_create_table_mysql(table: str, columns: List[Dict], pk_cols: List[str],
+                             indexes: Optional[List[Dict]] = None) -> Tuple[str, List[str]]:
+    """
+    Devuelve (CREATE TABLE solo con PK, CREATE INDEX de los índices secundarios). Los
+    índices se crean después de cargar los datos: construirlos de una vez por ordenación
+    es mucho más barato que mantenerlos fila a fila durante la carga. Se omiten los
+    índices con columnas que no se migran.
+    """
     parts = []
     for col in columns:
         col_def = f"`{col['name']}` {sqlserver_to_mysql_type(col)}"
@@ -197,75 +408,484 @@ def build_create_table_mysql(table: str, columns: List[Dict], pk_cols: List[str]
         else:
             col_def += " NULL"
         if col["default"]:
-            d = str(col["default"]).strip()
-            d = d.strip("()")
-            if d.lower() in ("getdate", "getdate()", "sysdatetime()", "current_timestamp"):
-                col_def += " DEFAULT CURRENT_TIMESTAMP"
-            elif d.lower() in ("newid", "newid()"):
-                pass
-            else:
-                try:
-                    float(d)
-                    col_def += f" DEFAULT {d}"
-                except Exception:
-                    d = d.lstrip("N").strip("'").replace("\\", "\\\\").replace("'", "\\'")
-                    col_def += f" DEFAULT '{d}'"
+            col_def += default_clause_mysql(col["default"])
         parts.append(col_def)
     if pk_cols:
         parts.append(f"PRIMARY KEY ({', '.join('`'+c+'`' for c in pk_cols)})")
     cols_sql = ",\n  ".join(parts)
-    return f"CREATE TABLE IF NOT EXISTS `{table}` (\n  {cols_sql}\n) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"
+    create_sql = f"CREATE TABLE IF NOT EXISTS `{table}` (\n  {cols_sql}\n) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"
+
+    by_name = {c["name"]: c for c in columns}
+    index_sqls = []
+    for idx in indexes or []:
+        if any(c not in by_name for c in idx["columns"]):
+            continue
+        idx_parts = [_index_part(by_name[c]) for c in idx["columns"]]
+        if None in idx_parts:
+            continue
+        # Con prefijo la unicidad sería sobre los primeros caracteres, no sobre el valor
+        prefixed = any(p for _, p in idx_parts)
+        unique = "UNIQUE " if idx["unique"] and not prefixed else ""
+        cols_sql = ", ".join(part for part, _ in idx_parts)
+        index_sqls.append(f"CREATE {unique}INDEX `{idx['name'][:64]}` ON `{table}` ({cols_sql})")
+    return create_sql, index_sqls
 
 def quote_ident_list(cols: List[str]) -> str:
     return ", ".join(f"`{c}`" for c in cols)
 
+# Plantillas SQL por (tabla, columnas), cacheadas: con varios hilos o reintentos de la
+# misma tabla no se vuelven a armar las cadenas
+@functools.lru_cache(maxsize=1024)
+def _select_template(schema: str, table: str, cols: Tuple[str, ...],
+                     order_cols: Tuple[str, ...] = ()) -> str:
+    order_by = f" ORDER BY {', '.join('['+c+']' for c in order_cols)}" if order_cols else ""
+    return f"SELECT {', '.join('['+c+']' for c in cols)} FROM [{schema}].[{table}]{order_by};"
+
+@functools.lru_cache(maxsize=1024)
+def _insert_template(table: str, cols: Tuple[str, ...], placeholders: bool = False) -> str:
+    """`INSERT ... VALUES ` listo para anexar filas; con placeholders incluye (?, ...) para ODBC."""
+    sql = f"INSERT INTO `{table}` ({quote_ident_list(cols)}) VALUES "
+    return sql + f"({', '.join('?' for _ in cols)})" if placeholders else sql
+
+def fetch_max_allowed_packet(mysql_cur) -> int:
+    mysql_cur.execute("SELECT @@SESSION.max_allowed_packet")
+    return int(mysql_cur.fetchone()[0])
+
+# Tamaño aproximado en bytes por tipo, para dimensionar los lotes según el ancho de fila
+_FIXED_BYTES = {
+    "bit": 1, "tinyint": 1, "smallint": 2, "int": 4, "bigint": 8,
+    "real": 4, "float": 8, "smallmoney": 4, "money": 8,
+    "date": 3, "time": 5, "datetime": 8, "datetime2": 8, "smalldatetime": 4,
+    "datetimeoffset": 10, "uniqueidentifier": 36,
+}
+_LOB_BYTES = 16_384  # estimación para (n)varchar(max), text, image, xml...
+
+def _est_col_bytes(col: Dict) -> int:
+    t = col["type"]
+    if t in _FIXED_BYTES:
+        return _FIXED_BYTES[t]
+    if t in ("decimal", "numeric"):
+        return (col["num_prec"] or 18) // 2 + 1
+    n = col["char_len"]
+    if n is None or n < 0 or t in ("text", "ntext", "image", "xml", "sql_variant"):
+        return _LOB_BYTES
+    return n
+
+def pick_batch_size(cols: List[Dict], target_bytes: int = 16 * 1024 * 1024,
+                    lo: int = 200, hi: int = 50_000) -> int:
+    """Filas por lote para que cada lote ronde `target_bytes`, acotado a [lo, hi]."""
+    row_bytes = max(1, sum(_est_col_bytes(c) for c in cols))
+    return max(lo, min(hi, target_bytes // row_bytes))
+
+# Codificadores de literales SQL por tipo de columna (evitan el despacho genérico
+# por type() de pymysql en cada celda); NULL se resuelve antes de llamarlos.
+def _enc_number(v) -> bytes:
+    # str(Decimal) puede dar notación científica ("1E-8"), que MySQL lee como DOUBLE
+    if isinstance(v, Decimal):
+        return format(v, "f").encode("ascii")
+    return str(v).encode("ascii")
+
+def _enc_bit(v) -> bytes:
+    return b"1" if v else b"0"
+
+def _enc_text(v) -> bytes:
+    if not isinstance(v, str):
+        return _enc_generic(v)
+    return b"'" + escape_string(v).encode("utf-8") + b"'"
+
+def _enc_temporal(v) -> bytes:
+    if isinstance(v, (str, bytes)):
+        return _enc_generic(v)
+    return b"'" + str(v).encode("ascii") + b"'"
+
+def _enc_binary(v) -> bytes:
+    return b"X'" + bytes(v).hex().encode("ascii") + b"'"
+
+def _enc_generic(v) -> bytes:
+    # escape_item devuelve los binarios con surrogateescape: se codifica igual que pymysql
+    return escape_item(v, "utf8mb4").encode("utf-8", "surrogateescape")
+
+_ENCODERS = {
+    "bigint": _enc_number, "int": _enc_number, "smallint": _enc_number, "tinyint": _enc_number,
+    "decimal": _enc_number, "numeric": _enc_number, "money": _enc_number,
+    "smallmoney": _enc_number, "float": _enc_number, "real": _enc_number,
+    "bit": _enc_bit,
+    "varchar": _enc_text, "nvarchar": _enc_text, "char": _enc_text, "nchar": _enc_text,
+    "text": _enc_text, "ntext": _enc_text, "xml": _enc_text, "uniqueidentifier": _enc_text,
+    "date": _enc_temporal, "datetime": _enc_temporal, "datetime2": _enc_temporal,
+    "smalldatetime": _enc_temporal, "time": _enc_temporal,
+    "binary": _enc_binary, "varbinary": _enc_binary, "image": _enc_binary,
+}
+
+# Con sql_mode NO_BACKSLASH_ESCAPES la barra invertida es literal: los textos solo
+# duplican la comilla simple (como hace pymysql en Connection.escape)
+def _enc_text_nb(v) -> bytes:
+    if not isinstance(v, str):
+        return _enc_generic_nb(v)
+    return b"'" + v.replace("'", "''").encode("utf-8") + b"'"
+
+def _enc_generic_nb(v) -> bytes:
+    if isinstance(v, str):
+        return _enc_text_nb(v)
+    return _enc_generic(v)
+
+_ENCODERS_NO_BACKSLASH = {
+    t: {_enc_text: _enc_text_nb, _enc_temporal: _enc_generic_nb}.get(f, f)
+    for t, f in _ENCODERS.items()
+}
+
+def no_backslash_escapes(mysql_conn) -> bool:
+    """Si la sesión MySQL tiene activo NO_BACKSLASH_ESCAPES (según el último estado del servidor)."""
+    return bool(getattr(mysql_conn, "server_status", 0) & SERVER_STATUS.SERVER_STATUS_NO_BACKSLASH_ESCAPES)
+
+def pick_encoder(sql_type: str, no_backslash: bool = False):
+    if no_backslash:
+        return _ENCODERS_NO_BACKSLASH.get(sql_type, _enc_generic_nb)
+    return _ENCODERS.get(sql_type, _enc_generic)
+
+def insert_multirow(mysql_cur, insert_prefix: bytes, encoders: List, rows, max_bytes: int) -> None:
+    """
+    Inserta las filas con INSERT ... VALUES (...),(...),... en el menor número de
+    sentencias posible, sin que ninguna supere max_bytes (max_allowed_packet).
+    Cada celda se codifica con el codificador de su columna (ver pick_encoder).
+    """
+    parts: List[bytes] = []
+    size = len(insert_prefix)
+    # Las filas de pyodbc se consumen tal cual llegan, sin copiar el lote a una lista
+    for r in rows:
+        v = b"(" + b",".join([b"NULL" if x is None else enc(x) for enc, x in zip(encoders, r)]) + b")"
+        if parts and size + len(v) + 1 > max_bytes:
+            mysql_cur.execute(insert_prefix + b",".join(parts))
+            parts, size = [], len(insert_prefix)
+        parts.append(v)
+        size += len(v) + 1
+    if parts:
+        mysql_cur.execute(insert_prefix + b",".join(parts))
+
+# ---------------------------
+# Carga masiva (LOAD DATA LOCAL INFILE)
+# ---------------------------
+_TSV_ESCAPES = ((b"\\", b"\\\\"), (b"\t", b"\\t"), (b"\n", b"\\n"),
+                (b"\r", b"\\r"), (b"\x00", b"\\0"))
+
+def _tsv_value(v) -> bytes:
+    """Serializa un valor al formato por defecto de LOAD DATA (tabulado, NULL = \\N)."""
+    if v is None:
+        return b"\\N"
+    if isinstance(v, bool):
+        return b"1" if v else b"0"
+    raw = bytes(v) if isinstance(v, (bytes, bytearray)) else str(v).encode("utf-8")
+    for a, b in _TSV_ESCAPES:
+        if a in raw:
+            raw = raw.replace(a, b)
+    return raw
+
+def check_load_warnings(mysql_cur, table: str) -> None:
+    """
+    LOAD DATA LOCAL se comporta como IGNORE: duplicados, truncados y conversiones
+    fallidas solo dejan advertencias. Si las hay se aborta en vez de dar por buena
+    una carga con filas omitidas o valores alterados.
+    """
+    count = getattr(mysql_cur, "warning_count", None)
+    if count is None:
+        mysql_cur.execute("SELECT @@warning_count")
+        count = mysql_cur.fetchone()[0]
+    if count:
+        mysql_cur.execute("SHOW WARNINGS LIMIT 3")
+        detail = "; ".join(str(w[2]) for w in mysql_cur.fetchall())
+        raise RuntimeError(f"LOAD DATA en {table} generó {count} advertencias: {detail}")
+
+# ER_NOT_ALLOWED_COMMAND y ER_CLIENT_LOCAL_FILES_DISABLED: LOCAL INFILE deshabilitado
+_LOCAL_INFILE_REFUSED = (1148, 3948)
+
+def local_infile_refused(e: Exception) -> bool:
+    """Si el error de LOAD DATA significa que LOCAL INFILE no está permitido (y no otro fallo)."""
+    return bool(e.args) and e.args[0] in _LOCAL_INFILE_REFUSED
+
+def load_rows_infile(mysql_cur, table: str, cols: List[str], rows) -> None:
+    """
+    Vuelca las filas a un archivo temporal tabulado y lo carga con LOAD DATA LOCAL INFILE.
+    Se usa CHARACTER SET binary para que MySQL no reconvierta los bytes (texto va en UTF-8).
+    """
+    fd, path = tempfile.mkstemp(suffix=".tsv")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.writelines(b"\t".join(map(_tsv_value, r)) + b"\n" for r in rows)
+        mysql_cur.execute(
+            f"LOAD DATA LOCAL INFILE '{escape_string(path)}' INTO TABLE `{table}` "
+            f"CHARACTER SET binary ({quote_ident_list(cols)})"
+        )
+        check_load_warnings(mysql_cur, table)
+    finally:
+        os.remove(path)
+
+
+# ---------------------------
+# Sesión de carga masiva
+# ---------------------------
+@contextmanager
+def bulk_load_session(mysql_cur, table: str, skip_binlog: bool = False):
+    """
+    Durante la carga desactiva unique_checks y foreign_key_checks (y sql_log_bin si
+    skip_binlog, solo cuando no hay réplicas que lo necesiten) y los restaura al salir.
+    En tablas MyISAM además se desactiva el mantenimiento de índices no únicos; en
+    InnoDB DISABLE KEYS no aplica y, como todo ALTER, confirmaría la transacción.
+    """
+    session_vars = ["unique_checks", "foreign_key_checks"] + (["sql_log_bin"] if skip_binlog else [])
+    previous = {}
+    for var in session_vars:
+        try:
+            mysql_cur.execute(f"SELECT @@SESSION.{var}")
+            value = mysql_cur.fetchone()[0]
+            mysql_cur.execute(f"SET SESSION {var}=0")
+            previous[var] = value
+        except DB_ERRORS as e:
+            log(f"[!] No se pudo desactivar {var}:", e)
+    # Literal escapado en vez de parámetro: PyMySQL usa %s y ODBC usa ?
+    mysql_cur.execute(
+        "SELECT ENGINE FROM information_schema.TABLES "
+        f"WHERE TABLE_SCHEMA=DATABASE() AND TABLE_NAME='{escape_string(table)}'"
+    )
+    row = mysql_cur.fetchone()
+    myisam = bool(row) and (row[0] or "").upper() == "MYISAM"
+    if myisam:
+        mysql_cur.execute(f"ALTER TABLE `{table}` DISABLE KEYS")
+    try:
+        yield
+    finally:
+        if myisam:
+            mysql_cur.execute(f"ALTER TABLE `{table}` ENABLE KEYS")
+        for var, value in previous.items():
+            try:
+                mysql_cur.execute(f"SET SESSION {var}={int(value)}")
+            except DB_ERRORS:
+                pass
+
+
+def create_post_indexes(mysql_cur, index_sqls: List[str]) -> None:
+    """
+    Crea los índices secundarios tras la carga. Los que ya existen se dejan como están y
+    los que fallan (p. ej. un UNIQUE que la intercalación de MySQL ve duplicado) se
+    informan sin abortar: los datos ya están cargados y el resto de índices se crea igual.
+    """
+    for stmt in index_sqls:
+        try:
+            log(f"[+] {stmt}")
+            mysql_cur.execute(stmt)
+        except DB_ERRORS as e:
+            # ER_DUP_KEYNAME (1061): la tabla ya existía con el índice
+            if (e.args and e.args[0] == 1061) or "Duplicate key name" in str(e):
+                continue
+            log(f"[!] No se pudo crear el índice ({stmt}):", e)
+
 
 # ---------------------------
 # Migración de datos
 # ---------------------------
-def copy_table(sql_cur, mysql_conn, mysql_cur, schema: str, table: str, batch_size: int = 10_000,
-               only_cols: Optional[List[str]] = None):
-    print(f"\n[+] Preparando migración de {schema}.{table} ...")
+# Marca que el lector envía al escritor cuando falla la lectura (None = fin normal)
+_ABORT = object()
+
+def copy_table(sql_cur, mysql_conn, mysql_cur, schema: str, table: str, batch_size: Optional[int] = None,
+               only_cols: Optional[List[str]] = None, cols_meta: Optional[List[Dict]] = None,
+               pk: Optional[List[str]] = None, skip_binlog: bool = False,
+               resumable: bool = False, indexes: Optional[List[Dict]] = None,
+               defer_indexes: bool = False, row_count: Optional[int] = None) -> List[str]:
+    """
+    Crea la tabla en MySQL y copia sus filas. cols_meta/pk/indexes permiten reutilizar
+    metadatos ya consultados y evitar volver a pedirlos a SQL Server. La copia corre
+    dentro de bulk_load_session (skip_binlog desactiva además el binlog). Con
+    resumable=True las filas se leen en orden de PK (determinista, para reanudar).
+    Los índices secundarios se crean al terminar la carga; con defer_indexes=True no se
+    crean y se devuelven sus sentencias para un pase posterior (create_post_indexes).
+    Sin batch_size, el tamaño de lote se calcula con el ancho estimado de fila. Si la
+    tabla origen está vacía (row_count == 0) solo se crea la tabla destino.
+    """
+    log(f"\n[+] Preparando migración de {schema}.{table} ...")
 
-    all_cols_meta = fetch_columns_sqlserver(sql_cur, schema, table)
-    pk = fetch_primary_key_sqlserver(sql_cur, schema, table)
+    all_cols_meta = cols_meta if cols_meta is not None else fetch_columns_sqlserver(sql_cur, schema, table)
+    if pk is None:
+        pk = fetch_primary_key_sqlserver(sql_cur, schema, table)
+    if indexes is None:
+        indexes = fetch_indexes_sqlserver(sql_cur, schema, table).get(table, [])
+    if row_count is None:
+        row_count = fetch_row_counts_sqlserver(sql_cur, schema, table).get(table)
 
     # Filtrar columnas si se especifica subconjunto
     if only_cols:
-        cols = [c for c in all_cols_meta if c["name"] in only_cols]
-        pk = [c for c in pk if c in only_cols]
+        only_set = set(only_cols)
+        cols = [c for c in all_cols_meta if c["name"] in only_set]
+        pk = [c for c in pk if c in only_set]
     else:
         cols = all_cols_meta
 
     # Crear tabla destino (solo con columnas elegidas)
-    create_sql = build_create_table_mysql(table, cols, pk)
-    print(f"[+] Creando tabla en MySQL si no existe...")
+    create_sql, index_sqls = build_create_table_mysql(table, cols, pk, indexes)
+    log(f"[+] Creando tabla en MySQL si no existe...")
     mysql_cur.execute(create_sql)
     mysql_conn.commit()
 
-    col_names = [c["name"] for c in cols]
-    select_cols = ", ".join(f"[{c}]" for c in col_names)
-    order_by = f" ORDER BY {', '.join('['+c+']' for c in pk)}" if pk else ""
-    sql_cur.execute(f"SELECT {select_cols} FROM [{schema}].[{table}]{order_by};")
+    if row_count == 0 and source_is_empty(sql_cur, schema, table):
+        log(f"[✓] Tabla {schema}.{table} vacía en origen; solo se creó la estructura.")
+        if defer_indexes:
+            return index_sqls
+        create_post_indexes(mysql_cur, index_sqls)
+        return []
+
+    if not batch_size:
+        batch_size = pick_batch_size(cols)
+    col_names = tuple(c["name"] for c in cols)
+    # La copia no necesita orden: sin ORDER BY SQL Server evita el SORT y puede usar scan paralelo
+    order_cols = tuple(pk) if resumable else ()
+    sql_cur.arraysize = batch_size
+    sql_cur.execute(_select_template(schema, table, col_names, order_cols))
 
-    # Preparar INSERT
-    placeholders = ", ".join(["%s"] * len(col_names))
-    insert_sql = f"INSERT INTO `{table}` ({quote_ident_list(col_names)}) VALUES ({placeholders})"
+    # INSERT multi-VALUES (si no hay LOAD DATA): un solo viaje por lote, partido solo si excede
+    # max_allowed_packet (se deja un 20% de margen)
+    no_backslash = no_backslash_escapes(mysql_conn)
+    encoders = [pick_encoder(c["type"], no_backslash) for c in cols]
+    odbc_dest = isinstance(mysql_cur, pyodbc.Cursor)
+    if odbc_dest:
+        mysql_cur.fast_executemany = True
+        odbc_insert = _insert_template(table, col_names, placeholders=True)
+    insert_prefix = _insert_template(table, col_names).encode("utf-8")
+    max_bytes = int(fetch_max_allowed_packet(mysql_cur) * 0.8)
 
+    # El hilo principal lee de SQL Server y un hilo escritor inserta en MySQL, unidos
+    # por una cola acotada (como mucho 2 lotes en vuelo). Cada conexión la usa un solo hilo.
+    q: "queue.Queue" = queue.Queue(maxsize=2)
+    errors: List[BaseException] = []
     total = 0
-    print(f"[+] Copiando datos por lotes de {batch_size} filas...")
-    while True:
-        rows = sql_cur.fetchmany(batch_size)
-        if not rows:
-            break
-        data = [tuple(row) for row in rows]
-        mysql_cur.executemany(insert_sql, data)
-        mysql_conn.commit()
-        total += len(data)
-        print(f"    - {total} filas migradas...")
+    report = progress_printer(f"{schema}.{table}")
 
-    print(f"[✓] Tabla {schema}.{table} migrada con {total} filas (columnas: {', '.join(col_names)}).")
+    def writer() -> None:
+        nonlocal total
+        use_infile = True
+        finished = False  # ya se leyó el fin (None) o el aviso de aborto del lector
+        try:
+            while True:
+                rows = q.get()
+                if rows is None or rows is _ABORT:
+                    finished = True
+                    break
+                if odbc_dest:
+                    mysql_cur.executemany(odbc_insert, rows)
+                else:
+                    if use_infile:
+                        try:
+                            load_rows_infile(mysql_cur, table, col_names, rows)
+                        except pymysql.err.MySQLError as e:
+                            if not local_infile_refused(e):
+                                raise
+                            # local_infile deshabilitado: seguimos con INSERT multi-VALUES
+                            log("[!] LOAD DATA LOCAL INFILE no disponible, se usa INSERT por lotes:", e)
+                            use_infile = False
+                    if not use_infile:
+                        insert_multirow(mysql_cur, insert_prefix, encoders, rows, max_bytes)
+                total += len(rows)
+                report(total)
+            if rows is _ABORT:
+                # Falló la lectura: no se confirma una tabla a medias
+                mysql_conn.rollback()
+            else:
+                # Toda la tabla en una sola transacción: un único flush del redo log
+                mysql_conn.commit()
+        except BaseException as e:
+            errors.append(e)
+            # Vaciar la cola para no bloquear al lector hasta que envíe el fin (si aún no llegó)
+            while not finished:
+                item = q.get()
+                finished = item is None or item is _ABORT
+
+    log(f"[+] Copiando datos por lotes de {batch_size} filas...")
+    with bulk_load_session(mysql_cur, table, skip_binlog):
+        t = threading.Thread(target=writer, name="mysql-writer", daemon=True)
+        t.start()
+        end = None
+        try:
+            while not errors:
+                rows = sql_cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                q.put(rows)
+        except BaseException:
+            end = _ABORT
+            raise
+        finally:
+            q.put(end)
+            t.join()
+    if errors:
+        raise errors[0]
 
+    log(f"[✓] Tabla {schema}.{table} migrada con {total} filas (columnas: {', '.join(col_names)}).")
+    if defer_indexes:
+        return index_sqls
+    create_post_indexes(mysql_cur, index_sqls)
+    return []
+
+def copy_tables(sql_cur, mysql_conn, mysql_cur, schema: str, tables: List[str], workers: int = 1,
+                make_sql_conn: Optional[Callable] = None, make_mysql_conn: Optional[Callable] = None):
+    """
+    Migra varias tablas con todas sus columnas; los metadatos del esquema se leen una
+    sola vez. Con workers > 1 las tablas se reparten en hilos y cada hilo abre su propio
+    par de conexiones con make_sql_conn/make_mysql_conn.
+    """
+    cols_by_table = fetch_all_columns_sqlserver(sql_cur, schema)
+    pk_by_table = fetch_all_pks_sqlserver(sql_cur, schema)
+    idx_by_table = fetch_indexes_sqlserver(sql_cur, schema)
+    counts = fetch_row_counts_sqlserver(sql_cur, schema)
+
+    # Todas las tablas se cargan sin índices secundarios; se crean al final en un solo pase
+    def work(t: str) -> List[str]:
+        if workers <= 1:
+            return copy_table(sql_cur, mysql_conn, mysql_cur, schema, t,
+                              cols_meta=cols_by_table.get(t, []), pk=pk_by_table.get(t, []),
+                              indexes=idx_by_table.get(t, []), defer_indexes=True,
+                              row_count=counts.get(t))
+        s_cnx, m_cnx = make_sql_conn(), make_mysql_conn()
+        try:
+            return copy_table(s_cnx.cursor(), m_cnx, m_cnx.cursor(), schema, t,
+                              cols_meta=cols_by_table.get(t, []), pk=pk_by_table.get(t, []),
+                              indexes=idx_by_table.get(t, []), defer_indexes=True,
+                              row_count=counts.get(t))
+        except BaseException:
+            m_cnx.rollback()
+            raise
+        finally:
+            s_cnx.close()
+            m_cnx.close()
+
+    pending: Dict[str, List[str]] = {}  # tabla terminada -> sus CREATE INDEX
+    try:
+        if workers <= 1:
+            for t in tables:
+                try:
+                    pending[t] = work(t)
+                except BaseException:
+                    # Sin esto el DDL de los índices confirmaría la tabla a medias
+                    mysql_conn.rollback()
+                    raise
+        else:
+            ex = ThreadPoolExecutor(max_workers=workers)
+            futures = {ex.submit(work, t): t for t in tables}
+            try:
+                for f in as_completed(futures):
+                    pending[futures[f]] = f.result()
+            finally:
+                # Ante el primer fallo no se empiezan las tablas que seguían en cola;
+                # las que ya estaban en curso terminan y se conservan
+                ex.shutdown(wait=True, cancel_futures=True)
+                for f, t in futures.items():
+                    if not f.cancelled() and f.exception() is None:
+                        pending[t] = f.result()
+    finally:
+        if pending:
+            log("\n[+] Creando índices secundarios...")
+            for t in tables:
+                if t in pending:
+                    create_post_indexes(mysql_cur, pending[t])
+        missing = [t for t in tables if t not in pending]
+        if missing:
+            log("[!] Tablas no migradas (sin datos ni índices secundarios):", ", ".join(missing))
 
 # ---------------------------
 # Flujo principal (Wizard)
@@ -302,19 +922,33 @@ def main():
     mysql_user = ask("Usuario MySQL", "root")
     mysql_pass = ask("Contraseña MySQL", secret=True)
     mysql_db = ask("Nombre de la base de datos destino (se creará si no existe)")
+    use_mysql_odbc = confirm("¿Conectar a MySQL por ODBC en lugar de PyMySQL?", False)
+    mysql_driver = ask("Driver ODBC de MySQL", "MySQL ODBC 8.0 Unicode Driver") if use_mysql_odbc else None
+
+    def open_mysql(database: Optional[str]):
+        if use_mysql_odbc:
+            return connect_mysql_odbc(mysql_driver, mysql_host, mysql_port, database, mysql_user, mysql_pass)
+        return connect_mysql(mysql_host, mysql_port, database, mysql_user, mysql_pass)
 
     try:
         # Conectar sin DB para poder crearla si no existe
-        mysql_cnx = connect_mysql(mysql_host, mysql_port, None, mysql_user, mysql_pass)
+        mysql_cnx = open_mysql(None)
         mysql_cur = mysql_cnx.cursor()
         mysql_cur.execute(f"CREATE DATABASE IF NOT EXISTS `{mysql_db}` DEFAULT CHARSET utf8mb4;")
         mysql_cnx.commit()
-        mysql_cnx.select_db(mysql_db)
+        mysql_cur.execute(f"USE `{mysql_db}`")
         print("[✓] Conectado a MySQL y base preparada.")
     except Exception as e:
         print("Error conectando a MySQL:", e)
         sys.exit(1)
 
+    # Conexiones adicionales para la migración de tablas en paralelo
+    def make_sql_conn():
+        return connect_sqlserver(dsn, server, sql_db, sql_user or None, sql_pass, driver)
+
+    def make_mysql_conn():
+        return open_mysql(mysql_db)
+
     try:
         # 2) Flujos según selección
         if migra_db_completa:
@@ -329,8 +963,9 @@ def main():
             if not confirm("¿Confirmas migrar todas las tablas con todas sus columnas?"):
                 print("Cancelado por el usuario.")
                 sys.exit(0)
-            for t in tables:
-                copy_table(sql_cur, mysql_cnx, mysql_cur, schema, t)
+            workers = max(1, int(ask("Tablas en paralelo", "4")))
+            copy_tables(sql_cur, mysql_cnx, mysql_cur, schema, tables, workers,
+                        make_sql_conn, make_mysql_conn)
 
         else:
             # No base completa -> ¿todas las tablas o una sola?
@@ -346,8 +981,9 @@ def main():
                 if not confirm("¿Confirmas migrar todas las tablas con todas sus columnas?"):
                     print("Cancelado por el usuario.")
                     sys.exit(0)
-                for t in tables:
-                    copy_table(sql_cur, mysql_cnx, mysql_cur, schema, t)
+                workers = max(1, int(ask("Tablas en paralelo", "4")))
+                copy_tables(sql_cur, mysql_cnx, mysql_cur, schema, tables, workers,
+                            make_sql_conn, make_mysql_conn)
 
             else:
                 # Una sola tabla -> elegir tabla
@@ -372,13 +1008,14 @@ def main():
                 if col_choice == "Todas las columnas":
                     copy_table(sql_cur, mysql_cnx, mysql_cur, schema, table)
                 else:
-                    all_cols = [c["name"] for c in fetch_columns_sqlserver(sql_cur, schema, table)]
+                    meta = fetch_columns_sqlserver(sql_cur, schema, table)
+                    all_cols = [m["name"] for m in meta]
                     only_cols = choose_columns_interactive(all_cols)
 
                     # Aviso por NOT NULL sin default si se excluyen
-                    meta = fetch_columns_sqlserver(sql_cur, schema, table)
                     meta_by = {m["name"]: m for m in meta}
-                    excluded = [c for c in all_cols if c not in only_cols]
+                    only_set = set(only_cols)
+                    excluded = [c for c in all_cols if c not in only_set]
                     risky = [c for c in excluded if (not meta_by[c]["nullable"]) and (meta_by[c]["default"] is None)]
                     if risky:
                         print("\n[!] Aviso: Estás excluyendo columnas NOT NULL sin DEFAULT:")
@@ -389,7 +1026,8 @@ def main():
                             print("Cancelado por el usuario.")
                             sys.exit(0)
 
-                    copy_table(sql_cur, mysql_cnx, mysql_cur, schema, table, only_cols=only_cols)
+                    copy_table(sql_cur, mysql_cnx, mysql_cur, schema, table, only_cols=only_cols,
+                               cols_meta=meta)
 
         print("\n[🎉] Migración finalizada con éxito.")
     except KeyboardInterrupt: